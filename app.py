@@ -3,8 +3,37 @@
 # jsonify: to convert Python dictionaries to JSON responses
 # request: to access incoming request data (e.g., POST data)
 # abort: to handle errors and send error status codes
-from flask import Flask, jsonify, request, abort
+# Response: to return pre-serialized JSON bytes directly
+from flask import Flask, Response, jsonify, request, abort
+from flask.json.provider import JSONProvider
 from flask_cors import CORS  # Enable Cross-Origin Resource Sharing for client apps
+import orjson  # Fast JSON encoder/decoder written in Rust
+from werkzeug.exceptions import BadRequest, NotFound
+from werkzeug.routing import IntegerConverter
+import fastjsonschema  # Compiles JSON schemas into fast validation functions
+import os
+import sys
+from uuid import uuid4
+
+
+# JSON provider that uses orjson instead of the standard library json module
+# Every jsonify(...) call in this file goes through this provider.
+class ORJSONProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string or bytes."""
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response without the extra bytes -> str -> bytes round trip."""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS),
+            mimetype="application/json",
+        )
 
 # Initialize the Flask app
 app = Flask(__name__)
@@ -13,26 +42,180 @@ app = Flask(__name__)
 # This allows requests from different origins (e.g., file:// or another port)
 CORS(app)
 
+# Serialize every JSON response with orjson
+app.json = ORJSONProvider(app)
+
+
+# URL converter for record IDs that only matches IDs that have been issued
+# Anything outside [1, last issued ID] is rejected during routing with a 404, before the handler runs.
+# CORS preflight (OPTIONS) requests are let through so browsers still get a 2xx preflight and see the real response.
+class BoundedIntConverter(IntegerConverter):
+    last_id = None  # Callable returning the highest ID issued so far
+    not_found = None  # Error message, matching the one the handlers use for a missing record
+
+    def to_python(self, value):
+        value = super().to_python(value)
+        if request.method != 'OPTIONS' and (value < 1 or value > self.last_id()):
+            # Raise NotFound rather than ValidationError: a failed conversion makes Werkzeug
+            # report 405 for PUT/DELETE, because the GET rule for the same path matched first.
+            raise NotFound(description=self.not_found)
+        return value
+
+
+class UserIdConverter(BoundedIntConverter):
+    last_id = staticmethod(lambda: _last_user_id)
+    not_found = "User not found"
+
+
+class TaskIdConverter(BoundedIntConverter):
+    last_id = staticmethod(lambda: _last_task_id)
+    not_found = "Task not found"
+
+
+app.url_map.converters['uid'] = UserIdConverter
+app.url_map.converters['tid'] = TaskIdConverter
+
+# Treat /users and /users/ as the same route instead of redirecting with a 301
+# This has to be set before any routes are added, since each rule copies it when registered.
+app.url_map.strict_slashes = False
+
 # In-memory "database" of users
-# This list holds a set of user dictionaries. 
+# This dictionary maps each user ID to a user dictionary, so lookups by ID are O(1).
 # In a real-world application, this would be replaced by a database such as MySQL, PostgreSQL, or MongoDB.
-users = [
-    {"id": 1, "name": "Alice", "age": 25},
-    {"id": 2, "name": "Bob", "age": 30},
-]
+users = {
+    1: {"id": 1, "name": "Alice", "age": 25},
+    2: {"id": 2, "name": "Bob", "age": 30},
+}
+
+#setting up in memory database of tasks, keyed by task ID
+tasks = {
+    1: {"id":1, "title": "Learn REST", "description": "Study REST principles", "user_id" : 1, "completed": True},
+    2: {"id":2, "title": "Build API", "description": "Complete the assigment", "user_id" : 2, "completed": False}
+}
+
+#highest IDs issued so far; new records count up from here, so IDs are never reused, even after deletes
+_last_user_id = max(users, default=0)
+_last_task_id = max(tasks, default=0)
+
+#reverse index of tasks per user ID ({user_id: {task_id: task}}) so a user's tasks can be found without scanning every task
+tasks_by_user = {}
+for task in tasks.values():
+    tasks_by_user.setdefault(task['user_id'], {})[task['id']] = task
+
+#collection versions, bumped on every write and sent to clients as ETags
+_users_version = 0
+_tasks_version = 0
+
+#per-process ID included in every ETag, since versions restart from 0 (with different data) when the process restarts
+_BOOT_ID = uuid4().hex
 
-#setting up in memory database of tasks 
-tasks = [
-    {"id":1, "title": "Learn REST", "description": "Study REST principles", "user_id" : 1, "completed": True},
-     {"id":2, "title": "Build API", "description": "Complete the assigment", "user_id" : 2, "completed": False}
-]
+#serialized JSON of whole collections as {name: (version, bytes)}; an entry is stale once its version is behind
+_json_cache = {}
+
+
+#request body schemas, compiled once at import time into plain Python validators
+#note: "integer" also accepts whole floats such as 1.0, so handlers convert integer fields with int() before storing them
+#integers are bounded to what orjson can encode (signed 64-bit), so a stored value can always be serialized
+_integer = {"type": "integer", "minimum": 0, "maximum": 2**63 - 1}
+_user_properties = {
+    "name": {"type": "string"},
+    "age": _integer,
+}
+_task_properties = {
+    "title": {"type": "string"},
+    "description": {"type": "string"},
+    "user_id": _integer,
+    "completed": {"type": "boolean"},
+}
+_user_validator = fastjsonschema.compile({"type": "object", "required": ["name"], "properties": _user_properties})
+_user_update_validator = fastjsonschema.compile({"type": "object", "properties": _user_properties})
+_task_validator = fastjsonschema.compile({"type": "object", "required": ["title", "user_id"], "properties": _task_properties})
+_task_update_validator = fastjsonschema.compile({"type": "object", "properties": _task_properties})
+
+
+#helper function to validate a request body against a compiled schema
+
+def validate(validator, data):
+    """Abort with a 400 error if data does not match the schema. """
+    try:
+        validator(data)
+    except fastjsonschema.JsonSchemaException as e:
+        abort(400, description=str(e))
+
+
+#helper function to read the JSON request body
+
+def read_json():
+    """Decode the request body with orjson; returns None if it is missing or not valid JSON. """
+    # Skips Flask's request.get_json (content-type check, charset detection, stdlib json)
+    raw = request.get_data(cache=False)
+    if not raw:
+        return None
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return None
 
 
 #helper function to check if the user exists
 
 def user_exists(user_id):
     """Check if a user exists by ID. """
-    return any(user['id']== user_id for user in users)
+    # The users dict already acts as the set of known IDs, so this is a single hashed lookup.
+    # Request bodies are schema-validated first, so user_id is always a number here (and therefore hashable).
+    return user_id in users
+
+
+#helper function to serialize a collection, reusing the cached bytes until the next write
+
+def serialize(version, get_items, cache_key=None):
+    """Return the JSON bytes for a collection at the given version. """
+    if cache_key is None:
+        return orjson.dumps(get_items())
+    cached = _json_cache.get(cache_key)
+    if cached is None or cached[0] != version:
+        cached = _json_cache[cache_key] = (version, orjson.dumps(get_items()))
+    return cached[1]
+
+
+#helper function to build a cacheable JSON response for a whole collection
+
+def collection_response(version, get_items, cache_key=None):
+    """Return the collection as JSON, or 304 Not Modified if the client's ETag is current. """
+    etag = f"{_BOOT_ID}-{version}"
+    if request.if_none_match.contains_weak(etag):
+        # The client already has this version, so skip serialization entirely
+        response = Response(status=304)
+    else:
+        # The body is already a single bytes object (Content-Length is set from it), so let
+        # Werkzeug hand it to the server as-is instead of wrapping it in an encoding iterator
+        response = Response(serialize(version, get_items, cache_key), status=200, mimetype="application/json",
+                            direct_passthrough=True)
+    response.set_etag(etag, weak=True)
+    return response
+
+# Error responses as JSON ({"error": "..."}) instead of Flask's HTML error pages
+# Bodies for the fixed error messages are encoded once at import time; other messages are encoded per request.
+_error_bodies = {
+    description: orjson.dumps({"error": description})
+    for description in (
+        BadRequest.description,
+        NotFound.description,
+        "Invalid or missing JSON",
+        "Task not found",
+        "User not found",
+    )
+}
+
+@app.errorhandler(400)
+@app.errorhandler(404)
+def error_response(e):
+    """Return a JSON body for an HTTP error raised by abort(). """
+    description = e.description or e.name
+    body = _error_bodies.get(description)
+    if body is None:
+        body = orjson.dumps({"error": description})
+    return Response(body, status=e.code, mimetype="application/json")
 
 # Define route to handle requests to the root URL ('/')
 @app.route('/')
@@ -52,63 +235,75 @@ def health_check():
 # It is used to map a specific URL (route) to a function in your Flask application.
 @app.route('/users', methods=['GET'])
 def get_users():
-    return jsonify(users), 200  # 200 is the HTTP status code for 'OK'
+    # orjson already produces bytes, so skip jsonify for the full collection
+    return collection_response(_users_version, lambda: list(users.values()), 'users')  # 200 'OK', or 304 'Not Modified'
 
 # Route to retrieve a single user by their ID (GET request)
 # When the client sends a GET request to /users/<id>, this function will return the user with the specified ID.
-@app.route('/users/<int:user_id>', methods=['GET'])
+@app.route('/users/<uid:user_id>', methods=['GET'])
 def get_user(user_id):
-    # Using a list comprehension to find the user by ID
-    user = next((user for user in users if user['id'] == user_id), None)
+    # Look up the user directly by ID
+    user = users.get(user_id)
     if user is None:
-        abort(404)  # If the user is not found, return a 404 error (Not Found)
+        abort(404, description="User not found")  # If the user is not found, return a 404 error (Not Found)
     return jsonify(user), 200  # Return the user as a JSON object with a 200 status code (OK)
 
 # Route to create a new user (POST request)
 # When the client sends a POST request to /users with user data, this function will add the new user to the list.
 @app.route('/users', methods=['POST'])
 def create_user():
+    global _users_version, _last_user_id
+    # Read the JSON body once; it is None if the body is missing or not valid JSON
+    data = read_json()
     # If the request body is not in JSON format or if the 'name' field is missing, return a 400 error (Bad Request)
-    if not request.json or not 'name' in request.json:
+    if not data:
         abort(400)
+    validate(_user_validator, data)
     
-    # Create a new user dictionary. Assign the next available ID by incrementing the highest current ID.
-    # If no users exist, the new ID will be 1.
+    # Create a new user dictionary. Assign the next ID after the highest one issued so far.
+    _last_user_id += 1
     new_user = {
-        'id': users[-1]['id'] + 1 if users else 1,
-        'name': request.json['name'],  # The name is provided in the POST request body
-        'age': request.json.get('age', 0)  # The age is optional; default is 0 if not provided
+        'id': _last_user_id,
+        'name': data['name'],  # The name is provided in the POST request body
+        'age': int(data.get('age', 0))  # The age is optional; default is 0 if not provided
     }
-    # Add the new user to the users list
-    users.append(new_user)
+    # Add the new user to the users dictionary
+    users[new_user['id']] = new_user
+    _users_version += 1
     return jsonify(new_user), 201  # 201 is the HTTP status code for 'Created'
 
 # Route to update an existing user (PUT request)
 # When the client sends a PUT request to /users/<id> with updated user data, this function will update the user.
-@app.route('/users/<int:user_id>', methods=['PUT'])
+@app.route('/users/<uid:user_id>', methods=['PUT'])
 def update_user(user_id):
+    global _users_version
     # Find the user by their ID
-    user = next((user for user in users if user['id'] == user_id), None)
+    user = users.get(user_id)
     if user is None:
-        abort(404)  # If the user is not found, return a 404 error (Not Found)
+        abort(404, description="User not found")  # If the user is not found, return a 404 error (Not Found)
     
     # If the request body is missing or not in JSON format, return a 400 error (Bad Request)
-    if not request.json:
+    data = read_json()
+    if not data:
         abort(400)
+    validate(_user_update_validator, data)
     
     # Update the user's data based on the request body
     # If a field is not provided in the request, keep the existing value
-    user['name'] = request.json.get('name', user['name'])
-    user['age'] = request.json.get('age', user['age'])
+    user['name'] = data.get('name', user['name'])
+    user['age'] = int(data.get('age', user['age']))
+    _users_version += 1
     return jsonify(user), 200  # Return the updated user data with a 200 status code (OK)
 
 # Route to delete a user (DELETE request)
 # When the client sends a DELETE request to /users/<id>, this function will remove the user with that ID.
-@app.route('/users/<int:user_id>', methods=['DELETE'])
+@app.route('/users/<uid:user_id>', methods=['DELETE'])
 def delete_user(user_id):
-    global users  # Reference the global users list
-    # Rebuild the users list, excluding the user with the specified ID
-    users = [user for user in users if user['id'] != user_id]
+    global _users_version
+    # Remove the user in a single lookup; None means it did not exist
+    if users.pop(user_id, None) is None:
+        abort(404, description="User not found")  # If the user is not found, return a 404 error (Not Found)
+    _users_version += 1
     return '', 204  # 204 is the HTTP status code for 'No Content', indicating the deletion was successful
 
 
@@ -118,16 +313,16 @@ def delete_user(user_id):
 @app.route('/tasks', methods=['GET'])
 def get_tasks():
     """Retrieve all tasks."""
-    return jsonify(tasks), 200
+    return collection_response(_tasks_version, lambda: list(tasks.values()), 'tasks')
 
 
 
 #get single task by id endpoint 
 
-@app.route('/tasks/<int:task_id>', methods=['GET'])
+@app.route('/tasks/<tid:task_id>', methods=['GET'])
 def get_task(task_id):
     """Retrieve a single task by ID."""
-    task = next((task for task in tasks if task['id'] == task_id), None)
+    task = tasks.get(task_id)
     if task is None:
         abort(404, description="Task not found")
     return jsonify(task), 200
@@ -137,90 +332,119 @@ def get_task(task_id):
 @app.route('/tasks', methods=['POST'])
 def create_task():
     """Create a new task."""
+    global _tasks_version, _last_task_id
     # Validate if medium is JSON
-    if not request.json:
+    data = read_json()
+    if not data:
         abort(400, description="Invalid or missing JSON")
     
-    # Validate required fields
-    if 'title' not in request.json:
-        abort(400, description="Missing required field: title")
-    if 'user_id' not in request.json:
-        abort(400, description="Missing required field: user_id")
+    # Validate required fields and field types
+    validate(_task_validator, data)
     
     # Validate user_id exists
-    user_id = request.json['user_id']
+    user_id = int(data['user_id'])
     if not user_exists(user_id):
         abort(400, description=f"User with ID {user_id} does not exist")
     
     # Create new task
+    _last_task_id += 1
     new_task = {
-        'id': tasks[-1]['id'] + 1 if tasks else 1,
-        'title': request.json['title'],
-        'description': request.json.get('description', ''),
+        'id': _last_task_id,
+        'title': data['title'],
+        'description': data.get('description', ''),
         'user_id': user_id,
-        'completed': request.json.get('completed', False)
+        'completed': data.get('completed', False)
     }
     
-    tasks.append(new_task)
+    tasks[new_task['id']] = new_task
+    tasks_by_user.setdefault(user_id, {})[new_task['id']] = new_task
+    _tasks_version += 1
     return jsonify(new_task), 201
 
 
 #implementing the PUT endpoint for tasks 
 
-@app.route('/tasks/<int:task_id>', methods=['PUT'])
+@app.route('/tasks/<tid:task_id>', methods=['PUT'])
 def update_task(task_id):
     """Update an existing task."""
+    global _tasks_version
     # Find task
-    task = next((task for task in tasks if task['id'] == task_id), None)
+    task = tasks.get(task_id)
     if task is None:
         abort(404, description="Task not found")
     
     # Validate JSON
-    if not request.json:
+    data = read_json()
+    if not data:
         abort(400, description="Invalid or missing JSON")
+    validate(_task_update_validator, data)
     
-    # Validate user_id if provided
-    if 'user_id' in request.json:
-        if not user_exists(request.json['user_id']):
-            abort(400, description=f"User with ID {request.json['user_id']} does not exist")
+    # Validate user_id if provided (the schema guarantees it is a whole number, so None means absent)
+    new_user_id = data.get('user_id')
+    if new_user_id is None:
+        new_user_id = task['user_id']
+    else:
+        new_user_id = int(new_user_id)
+        if not user_exists(new_user_id):
+            abort(400, description=f"User with ID {new_user_id} does not exist")
     
     # Update fields
-    task['title'] = request.json.get('title', task['title'])
-    task['description'] = request.json.get('description', task['description'])
-    task['user_id'] = request.json.get('user_id', task['user_id'])
-    task['completed'] = request.json.get('completed', task['completed'])
+    task['title'] = data.get('title', task['title'])
+    task['description'] = data.get('description', task['description'])
+    if new_user_id != task['user_id']:
+        # Move the task to its new owner in the per-user index
+        del tasks_by_user[task['user_id']][task_id]
+        bucket = tasks_by_user.setdefault(new_user_id, {})
+        # Buckets are kept in ID order; re-sort only if the moved task is older than the bucket's newest task
+        needs_sort = bool(bucket) and next(reversed(bucket)) > task_id
+        bucket[task_id] = task
+        if needs_sort:
+            tasks_by_user[new_user_id] = dict(sorted(bucket.items()))
+    task['user_id'] = new_user_id
+    task['completed'] = data.get('completed', task['completed'])
+    _tasks_version += 1
     
     return jsonify(task), 200
 
 #implementing the DELETE endpoint for tasks
-@app.route('/tasks/<int:task_id>', methods=['DELETE'])
+@app.route('/tasks/<tid:task_id>', methods=['DELETE'])
 def delete_task(task_id):
     """Delete a task."""
-    global tasks
-    
-    # Check if task exists
-    task = next((task for task in tasks if task['id'] == task_id), None)
+    global _tasks_version
+    # Remove the task in a single lookup; None means it did not exist
+    task = tasks.pop(task_id, None)
     if task is None:
         abort(404, description="Task not found")
     
-    # Remove task
-    tasks = [task for task in tasks if task['id'] != task_id]
+    del tasks_by_user[task['user_id']][task_id]
+    _tasks_version += 1
     return '', 204
 #implementing the user-tasks endpointto get all tasks for specific user
-@app.route('/users/<int:user_id>/tasks', methods=['GET'])
+@app.route('/users/<uid:user_id>/tasks', methods=['GET'])
 def get_user_tasks(user_id):
     """Retrieve all tasks for a specific user."""
     # Check if user exists
     if not user_exists(user_id):
         abort(404, description="User not found")
     
-    # Find tasks for this user
-    user_tasks = [task for task in tasks if task['user_id'] == user_id]
-    return jsonify(user_tasks), 200
+    # Find tasks for this user through the per-user index
+    return collection_response(_tasks_version, lambda: list(tasks_by_user.get(user_id, {}).values()))
+
+
+# All routes are registered, so build the URL matcher now instead of on the first request
+app.url_map.update()
 
 
 # Entry point for running the Flask app
-# The app will run on host 0.0.0.0 (accessible on all network interfaces) and port 8000.
-# Debug mode is disabled (set to False).
+# By default the app is served by gunicorn with a gevent worker (settings in gunicorn.conf.py):
+#   gunicorn app:app
+# Pass --dev to use Flask's built-in development server instead (required on Windows, where gunicorn does not run):
+#   python app.py --dev
+# Either way the app listens on host 0.0.0.0 (accessible on all network interfaces) and port 8000.
 if __name__ == '__main__':
-    app.run(debug=False, host='0.0.0.0', port=8000)
\ No newline at end of file
+    if '--dev' in sys.argv[1:]:
+        # Debug mode is disabled (set to False).
+        app.run(debug=False, host='0.0.0.0', port=8000)
+    else:
+        # Run gunicorn under this same interpreter, so it works without the venv's bin directory on PATH
+        os.execv(sys.executable, [sys.executable, '-m', 'gunicorn', 'app:app'])
\ No newline at end of file
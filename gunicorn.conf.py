@@ -0,0 +1,13 @@
+# Gunicorn settings for serving app:app
+# Run with: gunicorn app:app
+
+bind = "0.0.0.0:8000"
+
+# The users and tasks "database" lives in memory, so every worker process would
+# hold its own copy. Keep a single worker and get concurrency from gevent instead.
+# Running more processes (e.g. uvicorn --workers N behind an ASGI adapter) only
+# becomes safe once the data moves to a shared database. Until then, the GIL cost of
+# collection GETs is kept low by the cached JSON bytes and ETag 304s in app.py.
+workers = 1
+worker_class = "gevent"
+worker_connections = 1000